@@ -432,11 +432,46 @@ def wkt_to_gpkg_geom(wkt, **kwargs):
     return ogr_to_gpkg_geom(ogr_geom, **kwargs)
 
 
+# Little-endian ISO WKB point type codes, and the number of ordinates each has.
+_WKB_LE_POINT_ORDINATES = {
+    1: 2,  # POINT
+    1001: 3,  # POINT Z
+    2001: 3,  # POINT M
+    3001: 4,  # POINT ZM
+}
+
+# GPKG header for a little-endian geometry with no envelope and srs_id 0.
+_GPKG_LE_POINT_HEADER = struct.pack("<ccBBi", b"G", b"P", 0, _GPKG_LE_BIT, 0)
+
+
+def _le_point_wkb_to_gpkg_geom(wkb):
+    """
+    Fast path for the most common case of wkb_to_gpkg_geom - a non-empty little-endian point.
+    Points don't get envelopes, so the WKB can be used as-is without a round trip through OGR.
+    Returns None if the WKB is anything else.
+    """
+    if len(wkb) < 21 or wkb[0] != 1:
+        return None
+    (geom_type,) = struct.unpack_from("<I", wkb, 1)
+    num_ordinates = _WKB_LE_POINT_ORDINATES.get(geom_type)
+    if num_ordinates is None or len(wkb) != 5 + 8 * num_ordinates:
+        return None
+    if any(math.isnan(o) for o in struct.unpack_from(f"<{num_ordinates}d", wkb, 5)):
+        # POINT EMPTY is encoded using NaNs - leave it to OGR.
+        return None
+    return Geometry(_GPKG_LE_POINT_HEADER + bytes(wkb))
+
+
 def wkb_to_gpkg_geom(wkb, **kwargs):
     """Given a well-known-binary bytestring, returns a GPKG Geometry object."""
     if wkb is None:
         return None
 
+    if not kwargs:
+        gpkg_geom = _le_point_wkb_to_gpkg_geom(wkb)
+        if gpkg_geom is not None:
+            return gpkg_geom
+
     ogr_geom = ogr.CreateGeometryFromWkb(wkb)
     return ogr_to_gpkg_geom(ogr_geom, **kwargs)
 
@@ -185,12 +185,14 @@ class KartAdapter_SqlServer(BaseKartAdapter, Db_SqlServer):
         )
         yield "title", title
 
+        # Filtered to just this table, so that the PKs of every other table in the database aren't scanned too.
         primary_key_sql = """
             SELECT KCU.* FROM information_schema.key_column_usage KCU
             INNER JOIN information_schema.table_constraints TC
             ON KCU.constraint_schema = TC.constraint_schema
             AND KCU.constraint_name = TC.constraint_name
             WHERE TC.constraint_type = 'PRIMARY KEY'
+            AND TC.table_schema = :table_schema AND TC.table_name = :table_name
         """
 
         table_info_sql = f"""
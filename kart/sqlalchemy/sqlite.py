@@ -4,18 +4,36 @@ from pysqlite3 import dbapi2 as sqlite
 
 import sqlalchemy
 
+SQLITE_CACHE_SIZE_MiB = 64
 
-def sqlite_engine(path, *, journal_mode=None):
+
+def sqlite_engine(path, *, journal_mode=None, pragmas=None):
     """
     An engine for non-spatial, non-GPKG sqlite databases.
+
+    journal_mode - if set, the journal_mode to use, eg "WAL".
+    pragmas - dict of extra PRAGMAs to set on each new connection. These override the defaults.
     """
 
+    all_pragmas = {
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+        "cache_size": -SQLITE_CACHE_SIZE_MiB * 1024,
+    }
+    if journal_mode and journal_mode.upper() == "WAL":
+        # In WAL mode, synchronous=NORMAL can't corrupt the DB and saves an fsync on every commit.
+        # See https://www.sqlite.org/pragma.html#pragma_synchronous
+        all_pragmas["synchronous"] = "NORMAL"
+    if pragmas:
+        all_pragmas.update(pragmas)
+
     def _on_connect(pysqlite_conn, connection_record):
         pysqlite_conn.isolation_level = None
         dbcur = pysqlite_conn.cursor()
         if journal_mode:
             dbcur.execute(f"PRAGMA journal_mode = {journal_mode};")
-        dbcur.execute("PRAGMA foreign_keys = ON;")
+        for key, value in all_pragmas.items():
+            dbcur.execute(f"PRAGMA {key} = {value};")
 
     path = os.path.expanduser(path)
     engine = sqlalchemy.create_engine(f"sqlite:///{path}", module=sqlite)
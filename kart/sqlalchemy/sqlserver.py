@@ -36,7 +36,17 @@ class Db_SqlServer(BaseDb):
 
         msurl = urlunsplit([cls.INTERNAL_SCHEME, url_netloc, url.path, url_query, ""])
 
-        engine = sqlalchemy.create_engine(msurl, poolclass=cls._pool_class())
+        def _before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            # fast_executemany sends all the parameter sets of an executemany to the server in one go,
+            # instead of making a round trip for each one. It binds every value of a column using the same
+            # buffer, which doesn't suit all column types, so only statements that ask for it use it.
+            if executemany and context.execution_options.get("fast_executemany"):
+                cursor.fast_executemany = True
+
+        engine = sqlalchemy.create_engine(msurl, **cls._pool_kwargs())
+        sqlalchemy.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
         return engine
 
     @classmethod
@@ -95,3 +105,28 @@ class Db_SqlServer(BaseDb):
                 )
             )
             return {f"{row['table_schema']}.{row['table_name']}": None for row in r}
+
+    @classmethod
+    def drop_all_in_schema(cls, sess, db_schema):
+        """Drops all tables, routines, and sequences in schema db_schema."""
+        # Builds the list of DROP statements and runs them on the server, all in a single round trip.
+        # NOCOUNT stops the driver returning early with the rowcount of the first SELECT. It lasts for the rest
+        # of the connection's life, so it is switched off again - Kart relies on rowcount elsewhere.
+        sess.execute(
+            sqlalchemy.text(
+                """
+                SET NOCOUNT ON;
+                DECLARE @sql NVARCHAR(MAX) = N'';
+                SELECT @sql += N'DROP TABLE IF EXISTS ' + QUOTENAME(table_schema) + N'.' + QUOTENAME(table_name) + N';'
+                FROM information_schema.tables WHERE table_schema = :db_schema;
+                SELECT @sql += N'DROP ' + routine_type + N' IF EXISTS '
+                    + QUOTENAME(routine_schema) + N'.' + QUOTENAME(routine_name) + N';'
+                FROM information_schema.routines WHERE routine_schema = :db_schema;
+                SELECT @sql += N'DROP SEQUENCE IF EXISTS ' + QUOTENAME(sequence_schema) + N'.' + QUOTENAME(sequence_name) + N';'
+                FROM information_schema.sequences WHERE sequence_schema = :db_schema;
+                EXEC sp_executesql @sql;
+                SET NOCOUNT OFF;
+                """
+            ),
+            {"db_schema": db_schema},
+        )
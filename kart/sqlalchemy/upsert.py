@@ -2,14 +2,17 @@ from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import elements
 from sqlalchemy.sql.dml import ValuesBase
+from sqlalchemy.sql.traversals import InternalTraversal
 
 
-def upsert(table):
+def upsert(table, row_count=1):
     """
     Returns a SQL commmand to insert of replace into the given table.
     table - sqlalchemy table definition. At a minimum, column names and primary keys must be included.
+    row_count - the number of rows upserted by a single execution of the command. If this is more than one,
+        the command must be executed using params from Upsert.multirow_params. Only SQL Server supports this.
     """
-    return Upsert(table)
+    return Upsert(table, row_count=row_count)
 
 
 class Upsert(ValuesBase):
@@ -19,12 +22,19 @@ class Upsert(ValuesBase):
     in which case, performs an UPDATE.
     """
 
+    # ValuesBase doesn't define these, so without them Upsert has no cache key and is recompiled every time
+    # it is executed. Everything the dialect-specific compilers below use is derived from these fields.
+    _traverse_internals = [
+        ("table", InternalTraversal.dp_clauseelement),
+        ("row_count", InternalTraversal.dp_plain_obj),
+    ]
     inherit_cache = True
 
-    def __init__(self, table):
+    def __init__(self, table, row_count=1):
         ValuesBase.__init__(self, table, None, None)
         self._returning = None
         self._inline = None
+        self.row_count = row_count
 
     @property
     def columns(self):
@@ -38,18 +48,52 @@ class Upsert(ValuesBase):
     def non_pk_columns(self):
         return [c for c in self.table.columns if not c.primary_key]
 
-    def values(self, compiler):
-        return [self._create_bind_param(compiler, c) for c in self.table.columns]
-
-    def _create_bind_param(self, compiler, col, process=True):
-        bindparam = elements.BindParameter(col.key, type_=col.type, required=True)
+    def values(self, compiler, row_index=None):
+        return [
+            self._create_bind_param(compiler, c, row_index) for c in self.table.columns
+        ]
+
+    def multirow_values(self, compiler):
+        """Returns a list of bind params for each of the row_count rows."""
+        if self.row_count == 1:
+            return [self.values(compiler)]
+        return [self.values(compiler, i) for i in range(self.row_count)]
+
+    def multirow_params(self, row_dicts):
+        """Flattens the given list of row dicts into the params required by a multi-row upsert."""
+        assert len(row_dicts) == self.row_count
+        if self.row_count == 1:
+            return row_dicts[0]
+        return {
+            self._bind_param_key(key, i): value
+            for i, row_dict in enumerate(row_dicts)
+            for key, value in row_dict.items()
+        }
+
+    @classmethod
+    def _bind_param_key(cls, col_key, row_index=None):
+        return col_key if row_index is None else f"{col_key}_{row_index}"
+
+    def _create_bind_param(self, compiler, col, row_index=None):
+        bindparam = elements.BindParameter(
+            self._bind_param_key(col.key, row_index), type_=col.type, required=True
+        )
         bindparam._is_crud = True
         bindparam = bindparam._compiler_dispatch(compiler)
         return bindparam
 
 
+def _check_single_row(upsert_stmt, compiler):
+    # Multi-row upserts are only needed (and tested) for SQL Server - see compile_upsert_mssql.
+    if upsert_stmt.row_count != 1:
+        raise NotImplementedError(
+            f"Multi-row upsert is not supported for {compiler.dialect.name}"
+        )
+
+
 @compiles(Upsert, "sqlite")
 def compile_upsert_sqlite(upsert_stmt, compiler, **kwargs):
+    _check_single_row(upsert_stmt, compiler)
     # See https://sqlite.org/lang_insert.html
     insert_stmt = upsert_stmt.table.insert().prefix_with("OR REPLACE")
     return compiler.process(insert_stmt)
@@ -57,6 +101,7 @@ def compile_upsert_sqlite(upsert_stmt, compiler, **kwargs):
 
 @compiles(Upsert, "postgresql")
 def compile_upsert_postgresql(upsert_stmt, compiler, **kwargs):
+    _check_single_row(upsert_stmt, compiler)
     # See https://docs.sqlalchemy.org/en/14/dialects/postgresql.html#insert-on-conflict-upsert
     insert_stmt = postgresql_insert(upsert_stmt.table)
     pk_col_names = [c.name for c in upsert_stmt.pk_columns]
@@ -71,6 +116,7 @@ def compile_upsert_postgresql(upsert_stmt, compiler, **kwargs):
 
 @compiles(Upsert, "mysql")
 def compile_upsert_mysql(upsert_stmt, compiler, **kwargs):
+    _check_single_row(upsert_stmt, compiler)
     # See https://dev.mysql.com/doc/refman/8.0/en/insert-on-duplicate.html
     preparer = compiler.preparer
 
@@ -110,7 +156,12 @@ def compile_upsert_mssql(upsert_stmt, compiler, **kwargs):
     def list_cols(col_names, prefix=""):
         return ", ".join([prefix + c for c in col_names])
 
-    values = ", ".join(upsert_stmt.values(compiler))
+    # A table-value constructor - one or more rows of values. See
+    # https://docs.microsoft.com/sql/t-sql/queries/table-value-constructor-transact-sql
+    values = ", ".join(
+        f"({', '.join(row_values)})"
+        for row_values in upsert_stmt.multirow_values(compiler)
+    )
 
     table = preparer.format_table(upsert_stmt.table)
     all_columns = [preparer.quote(c.name) for c in upsert_stmt.columns]
@@ -118,7 +169,7 @@ def compile_upsert_mssql(upsert_stmt, compiler, **kwargs):
     non_pk_columns = [preparer.quote(c.name) for c in upsert_stmt.non_pk_columns]
 
     result = f"MERGE {table} TARGET"
-    result += f" USING (VALUES ({values})) AS SOURCE ({list_cols(all_columns)})"
+    result += f" USING (VALUES {values}) AS SOURCE ({list_cols(all_columns)})"
 
     result += " ON "
     result += " AND ".join([f"SOURCE.{c} = TARGET.{c}" for c in pk_columns])
@@ -111,6 +111,7 @@ class TableWorkingCopy(WorkingCopyPart):
         )
         return self.preparer.format_table(sqlalchemy_table)
 
+    @functools.lru_cache()
     def _quoted_tracking_name(self, trigger_type, dataset=None):
         """
         Returns the name of the trigger responsible for populating the kart_track table.
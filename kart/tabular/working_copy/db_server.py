@@ -114,37 +114,38 @@ class DatabaseServer_WorkingCopy(TableWorkingCopy):
         result = 0
         try:
             with self.session() as sess:
-                if not sess.scalar(
-                    "SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name=:schema_name;",
-                    {"schema_name": self.db_schema},
-                ):
-                    return result
-
-                result |= TableWorkingCopyStatus.DB_SCHEMA_EXISTS
-
-                kart_table_count = sess.scalar(
+                # All the catalog lookups are done in a single round trip.
+                # EXISTS stops at the first matching row, rather than counting them all.
+                schema_exists, kart_table_count, has_data = sess.execute(
                     """
-                    SELECT COUNT(*) FROM information_schema.tables
-                    WHERE table_schema=:table_schema AND table_name IN (:kart_state_name, :kart_track_name);
+                    SELECT
+                        CASE WHEN EXISTS (
+                            SELECT 1 FROM information_schema.schemata WHERE schema_name=:table_schema
+                        ) THEN 1 ELSE 0 END,
+                        (
+                            SELECT COUNT(*) FROM information_schema.tables
+                            WHERE table_schema=:table_schema AND table_name IN (:kart_state_name, :kart_track_name)
+                        ),
+                        CASE WHEN EXISTS (
+                            SELECT 1 FROM information_schema.tables
+                            WHERE table_schema=:table_schema AND table_name NOT IN (:kart_state_name, :kart_track_name)
+                        ) THEN 1 ELSE 0 END;
                     """,
                     {
                         "table_schema": self.db_schema,
                         "kart_state_name": self.KART_STATE_NAME,
                         "kart_track_name": self.KART_TRACK_NAME,
                     },
-                )
-                schema_table_count = sess.scalar(
-                    """
-                    SELECT COUNT(*) FROM information_schema.tables
-                    WHERE table_schema=:table_schema;
-                    """,
-                    {"table_schema": self.db_schema},
-                )
-                if schema_table_count:
+                ).fetchone()
+                if not schema_exists:
+                    return result
+
+                result |= TableWorkingCopyStatus.DB_SCHEMA_EXISTS
+                if kart_table_count or has_data:
                     result |= TableWorkingCopyStatus.NON_EMPTY
                 if kart_table_count == 2:
                     result |= TableWorkingCopyStatus.INITIALISED
-                if schema_table_count > kart_table_count:
+                if has_data:
                     result |= TableWorkingCopyStatus.HAS_DATA
 
             if (
@@ -172,13 +173,22 @@ class DatabaseServer_WorkingCopy(TableWorkingCopy):
         """Creates the schema named by self.db_schema, if it doesn't exist."""
         # We have to check if the schema exists before creating it.
         # CREATE SCHEMA IF NOT EXISTS may not work at all, or may require CREATE permissions even if the schema exists.
-        schema_exists = sess.scalar(
-            "SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name=:schema_name;",
-            {"schema_name": self.db_schema},
-        )
-        if not schema_exists:
+        if not self._schema_exists(sess):
             sess.execute(f"CREATE SCHEMA {self.DB_SCHEMA}")
 
+    def _schema_exists(self, sess):
+        """Returns True if the schema named by self.db_schema exists."""
+        return bool(
+            sess.scalar(
+                """
+                SELECT CASE WHEN EXISTS (
+                    SELECT 1 FROM information_schema.schemata WHERE schema_name=:schema_name
+                ) THEN 1 ELSE 0 END;
+                """,
+                {"schema_name": self.db_schema},
+            )
+        )
+
     def create_common_functions(self, sess):
         """
         Create any functions that are not specific to a particular user table, but are common to any/all of them,
@@ -191,15 +201,15 @@ class DatabaseServer_WorkingCopy(TableWorkingCopy):
         # if they've been linked to it using foreign keys, and we only want to delete the schema that we manage.
         with self.session() as sess:
             self.adapter.drop_all_in_schema(sess, self.db_schema)
-
-        if not keep_db_schema_if_possible:
-            with self.session() as sess:
+            if not keep_db_schema_if_possible:
                 self._drop_schema(sess, treat_error_as_warning=True)
 
     def _drop_schema(self, sess, treat_error_as_warning=False):
         """Drops the schema self.db_schema"""
         try:
-            sess.execute(f"DROP SCHEMA IF EXISTS {self.DB_SCHEMA};")
+            # A savepoint, so that if this fails, everything else done in this session can still be committed.
+            with self._savepoint(sess):
+                sess.execute(f"DROP SCHEMA IF EXISTS {self.DB_SCHEMA};")
         except DBAPIError as e:
             if treat_error_as_warning:
                 click.echo(
@@ -208,3 +218,7 @@ class DatabaseServer_WorkingCopy(TableWorkingCopy):
                 )
             else:
                 raise e
+
+    def _savepoint(self, sess):
+        """Context manager for a savepoint - if the block raises an error, only the changes it made are rolled back."""
+        return sess.begin_nested()
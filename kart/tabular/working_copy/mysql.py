@@ -59,6 +59,11 @@ class WorkingCopy_MySql(DatabaseServer_WorkingCopy):
 
         self.kart_tables = MySqlKartTables(self.db_schema, repo.is_kart_branded)
 
+    def _savepoint(self, sess):
+        # DDL statements implicitly commit in MySQL, which releases any savepoints. A failed DDL statement
+        # doesn't affect what has already been committed, so there's nothing for a savepoint to protect.
+        return contextlib.nullcontext()
+
     def _create_table_for_dataset(self, sess, dataset):
         table_spec = self.adapter.v2_schema_to_sql_spec(dataset.schema, dataset)
         sess.execute(
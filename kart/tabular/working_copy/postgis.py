@@ -99,9 +99,7 @@ class WorkingCopy_Postgis(DatabaseServer_WorkingCopy):
             # Don't worry about constraints when dropping everything.
             sess.execute("SET CONSTRAINTS ALL DEFERRED;")
             self.adapter.drop_all_in_schema(sess, self.db_schema)
-
-        if not keep_db_schema_if_possible:
-            with self.session() as sess:
+            if not keep_db_schema_if_possible:
                 self._drop_schema(sess, treat_error_as_warning=True)
 
     def _drop_all_functions(self, sess):
@@ -3,9 +3,11 @@ import logging
 import time
 
 from kart import crs_util
-from kart.sqlalchemy import separate_last_path_part, text_with_inlined_params
+from kart.sqlalchemy import separate_last_path_part
 from kart.sqlalchemy.adapter.sqlserver import KartAdapter_SqlServer
 from kart.schema import Schema
+from kart.sqlalchemy.upsert import Upsert as upsert
+from kart.utils import chunk
 from sqlalchemy.dialects.mssql.base import MSIdentifierPreparer
 from sqlalchemy.orm import sessionmaker
 
@@ -29,6 +31,17 @@ class WorkingCopy_SqlServer(DatabaseServer_WorkingCopy):
     WORKING_COPY_TYPE_NAME = "SQL Server"
     URI_SCHEME = "mssql"
 
+    # SQL Server allows at most 2100 parameters in a single statement.
+    MAX_PARAMS_PER_STATEMENT = 2000
+    # How many multi-row MERGE statements are sent to the server at once, using executemany.
+    STATEMENTS_PER_EXECUTEMANY = 20
+    # When writing at least this many features, they are written to a staging table first.
+    STAGING_TABLE_MIN_ROWS = 10000
+    # Tables with names starting with # are temporary tables, private to the current connection.
+    STAGING_TABLE_NAME = "#kart_stage"
+    # While the current connection's CONTEXT_INFO starts with this value, the tracking triggers do nothing.
+    SUSPEND_TRIGGERS_CONTEXT_INFO = b"kart_suspend_triggers"
+
     def __init__(self, repo, location):
         """
         uri: connection string of the form mssql://[user[:password]@][netloc][:port][/dbname/schema][?param1=value1&...]
@@ -47,6 +60,19 @@ class WorkingCopy_SqlServer(DatabaseServer_WorkingCopy):
         self.preparer = MSIdentifierPreparer(self.engine.dialect)
 
         self.kart_tables = SqlServerKartTables(self.db_schema, repo.is_kart_branded)
+        # {table_name: bool} - whether that table's trigger can be suspended using CONTEXT_INFO.
+        self._context_info_triggers = {}
+
+    def create_schema(self, sess):
+        # Check and create in a single round trip. CREATE SCHEMA must be the only statement in its batch,
+        # so it is run using EXEC.
+        sess.execute(
+            f"""
+            IF SCHEMA_ID(:schema_name) IS NULL
+                EXEC({self._quote_literal(f"CREATE SCHEMA {self.DB_SCHEMA}")});
+            """,
+            {"schema_name": self.db_schema},
+        )
 
     def _create_table_for_dataset(self, sess, dataset):
         table_spec = self.adapter.v2_schema_to_sql_spec(dataset.schema, dataset)
@@ -62,6 +88,102 @@ class WorkingCopy_SqlServer(DatabaseServer_WorkingCopy):
             },
         )
 
+    def _write_features_from_dataset(
+        self, sess, dataset, pk_list, *, ignore_missing=False
+    ):
+        # Overridden to write features in bulk, rather than with one MERGE per feature.
+        if not pk_list:
+            return 0
+
+        features = dataset.get_features_with_crs_ids(
+            pk_list,
+            ignore_missing=ignore_missing,
+            spatial_filter=self.repo.spatial_filter,
+        )
+        if len(pk_list) >= self.STAGING_TABLE_MIN_ROWS:
+            return self._upsert_features_via_staging_table(sess, dataset, features)
+        return self._upsert_features_via_multirow_merge(sess, dataset, features)
+
+    def _upsert_features_via_multirow_merge(self, sess, dataset, features):
+        """
+        Upserts many features with each MERGE statement, and sends batches of these MERGE statements
+        using executemany with pyodbc's fast_executemany.
+        """
+        table_def = self._table_def_for_dataset(dataset)
+        # Some columns (eg geometry) use their bind param more than once, so count the params for a single row.
+        params_per_row = len(
+            upsert(table_def).compile(dialect=self.engine.dialect).positiontup
+        )
+        rows_per_statement = max(1, self.MAX_PARAMS_PER_STATEMENT // params_per_row)
+        sql = upsert(table_def, row_count=rows_per_statement)
+
+        feat_count = 0
+        CHUNK_SIZE = rows_per_statement * self.STATEMENTS_PER_EXECUTEMANY
+        for row_dicts in chunk(features, CHUNK_SIZE):
+            statement_rows = list(chunk(row_dicts, rows_per_statement))
+            # Rows that don't fill a whole statement - this only happens on the last chunk.
+            leftover_rows = (
+                statement_rows.pop()
+                if len(statement_rows[-1]) < rows_per_statement
+                else None
+            )
+            if statement_rows:
+                sess.execute(
+                    sql,
+                    [sql.multirow_params(rows) for rows in statement_rows],
+                    execution_options={"fast_executemany": True},
+                )
+            if leftover_rows:
+                leftover_sql = upsert(table_def, row_count=len(leftover_rows))
+                sess.execute(leftover_sql, leftover_sql.multirow_params(leftover_rows))
+            feat_count += len(row_dicts)
+
+        return feat_count
+
+    def _upsert_features_via_staging_table(self, sess, dataset, features):
+        """
+        Inserts all the features into a temporary staging table that has the same columns as the dataset table,
+        then upserts them all into the dataset table with a single set-based MERGE.
+        """
+        stage_def = self.adapter.table_def_for_schema(
+            dataset.schema, table_name=self.STAGING_TABLE_NAME, dataset=dataset
+        )
+        stage = self.quote(self.STAGING_TABLE_NAME)
+        table = self.table_identifier(dataset)
+
+        # Copies the column definitions (but not constraints or indexes) of the dataset table.
+        sess.execute(f"DROP TABLE IF EXISTS {stage};")
+        sess.execute(f"SELECT TOP 0 * INTO {stage} FROM {table};")
+
+        try:
+            sql = stage_def.insert()
+            feat_count = 0
+            CHUNK_SIZE = 2000
+            for row_dicts in chunk(features, CHUNK_SIZE):
+                sess.execute(
+                    sql, row_dicts, execution_options={"fast_executemany": True}
+                )
+                feat_count += len(row_dicts)
+
+            all_cols = [self.quote(c.name) for c in stage_def.columns]
+            pk_cols = [self.quote(c.name) for c in stage_def.columns if c.primary_key]
+            non_pk_cols = [
+                self.quote(c.name) for c in stage_def.columns if not c.primary_key
+            ]
+            sess.execute(
+                f"""
+                MERGE {table} TARGET USING {stage} SOURCE
+                ON {" AND ".join(f"SOURCE.{c} = TARGET.{c}" for c in pk_cols)}
+                WHEN MATCHED THEN UPDATE SET {", ".join(f"{c} = SOURCE.{c}" for c in non_pk_cols)}
+                WHEN NOT MATCHED THEN INSERT ({", ".join(all_cols)})
+                VALUES ({", ".join(f"SOURCE.{c}" for c in all_cols)});
+                """
+            )
+        finally:
+            # The staging table lasts as long as the connection does, which may be returned to the pool.
+            sess.execute(f"DROP TABLE IF EXISTS {stage};")
+        return feat_count
+
     def _write_meta(self, sess, dataset):
         # There is no metadata stored anywhere except the table itself, so nothing to write.
         pass
@@ -122,16 +244,13 @@ class WorkingCopy_SqlServer(DatabaseServer_WorkingCopy):
         L.debug("Creating spatial index for %s.%s", dataset.table_name, geom_col)
         t0 = time.monotonic()
 
-        # Placeholders not allowed in CREATE SPATIAL INDEX - have to use text_with_inlined_params.
+        # Placeholders not allowed in CREATE SPATIAL INDEX - but these are floats we computed, so can be inlined directly.
         sess.execute(
-            text_with_inlined_params(
-                f"""
-                CREATE SPATIAL INDEX {self.quote(index_name)}
-                ON {self.table_identifier(dataset)} ({self.quote(geom_col)})
-                WITH (BOUNDING_BOX = (:min_x, :min_y, :max_x, :max_y));
-                """,
-                {"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y},
-            )
+            f"""
+            CREATE SPATIAL INDEX {self.quote(index_name)}
+            ON {self.table_identifier(dataset)} ({self.quote(geom_col)})
+            WITH (BOUNDING_BOX = ({float(min_x)!r}, {float(min_y)!r}, {float(max_x)!r}, {float(max_y)!r}));
+            """
         )
 
         L.info("Created spatial index in %.1fs", time.monotonic() - t0)
@@ -204,38 +323,76 @@ class WorkingCopy_SqlServer(DatabaseServer_WorkingCopy):
         return f"{dataset.table_name}_sno_track"
 
     def create_triggers(self, sess, dataset):
-        pk_name = dataset.primary_key
-        # Placeholders not allowed in CREATE TRIGGER - have to use text_with_inlined_params.
+        # The PK is cast to the type of kart_track.pk so that the NOT EXISTS check can seek on kart_track's PK.
+        # UNION (not UNION ALL) is required since an UPDATE puts the same PK in both inserted and deleted.
+        pk_as_text = f"CAST({self.quote(dataset.primary_key)} AS NVARCHAR(400))"
+        # Placeholders not allowed in CREATE TRIGGER - have to inline the table name as a string literal.
+        table_name = self._quote_literal(dataset.table_name)
         sess.execute(
-            text_with_inlined_params(
-                f"""
-                CREATE TRIGGER {self._quoted_tracking_name("trigger", dataset)}
-                ON {self.table_identifier(dataset)}
-                AFTER INSERT, UPDATE, DELETE AS
-                BEGIN
-                    MERGE {self.KART_TRACK} TRA
-                    USING
-                        (SELECT :table_name1, {self.quote(pk_name)} FROM inserted
-                        UNION SELECT :table_name2, {self.quote(pk_name)} FROM deleted)
-                        AS SRC (table_name, pk)
-                    ON SRC.table_name = TRA.table_name AND SRC.pk = TRA.pk
-                    WHEN NOT MATCHED THEN INSERT (table_name, pk) VALUES (SRC.table_name, SRC.pk);
-                END;
-                """,
-                {"table_name1": dataset.table_name, "table_name2": dataset.table_name},
-            )
+            f"""
+            CREATE TRIGGER {self._quoted_tracking_name("trigger", dataset)}
+            ON {self.table_identifier(dataset)}
+            AFTER INSERT, UPDATE, DELETE AS
+            BEGIN
+                IF SUBSTRING(CONTEXT_INFO(), 1, {len(self.SUSPEND_TRIGGERS_CONTEXT_INFO)}) = {self._context_info_literal()} RETURN;
+                INSERT INTO {self.KART_TRACK} (table_name, pk)
+                SELECT {table_name}, SRC.pk FROM
+                    (SELECT {pk_as_text} FROM inserted UNION SELECT {pk_as_text} FROM deleted)
+                    AS SRC (pk)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {self.KART_TRACK} TRA
+                    WHERE TRA.table_name = {table_name} AND TRA.pk = SRC.pk
+                );
+            END;
+            """
         )
+        self._context_info_triggers[dataset.table_name] = True
+
+    @classmethod
+    def _quote_literal(cls, value):
+        """Quotes the given string as a SQL Server unicode string literal."""
+        return "N'" + value.replace("'", "''") + "'"
+
+    @classmethod
+    def _context_info_literal(cls):
+        return "0x" + cls.SUSPEND_TRIGGERS_CONTEXT_INFO.hex()
+
+    def _is_context_info_trigger(self, sess, dataset):
+        """
+        Returns True if the given dataset's trigger can be suspended using CONTEXT_INFO.
+        Triggers created by older versions of Kart can't be. Only looked up once per dataset.
+        """
+        table_name = dataset.table_name
+        if table_name not in self._context_info_triggers:
+            trigger_definition = sess.scalar(
+                "SELECT OBJECT_DEFINITION(OBJECT_ID(:trigger_name));",
+                {"trigger_name": self._quoted_tracking_name("trigger", dataset)},
+            )
+            self._context_info_triggers[table_name] = bool(
+                trigger_definition and "CONTEXT_INFO()" in trigger_definition
+            )
+        return self._context_info_triggers[table_name]
 
     @contextlib.contextmanager
     def _suspend_triggers(self, sess, dataset):
-        trigger_name = self._quoted_tracking_name("trigger", dataset)
-        sess.execute(
-            f"""DISABLE TRIGGER {trigger_name} ON {self.table_identifier(dataset)};"""
-        )
-        yield
-        sess.execute(
-            f"""ENABLE TRIGGER {trigger_name} ON {self.table_identifier(dataset)};"""
-        )
+        if self._is_context_info_trigger(sess, dataset):
+            # The trigger returns early while CONTEXT_INFO is set - this only affects the current connection,
+            # and unlike DISABLE TRIGGER, doesn't need a schema-modification lock on the table.
+            sess.execute(f"SET CONTEXT_INFO {self._context_info_literal()};")
+            try:
+                yield
+            finally:
+                # A rollback doesn't undo SET CONTEXT_INFO, and this connection may be reused from the pool.
+                sess.execute("SET CONTEXT_INFO 0x00;")
+        else:
+            trigger_name = self._quoted_tracking_name("trigger", dataset)
+            sess.execute(
+                f"""DISABLE TRIGGER {trigger_name} ON {self.table_identifier(dataset)};"""
+            )
+            yield
+            sess.execute(
+                f"""ENABLE TRIGGER {trigger_name} ON {self.table_identifier(dataset)};"""
+            )
 
     @classmethod
     def try_align_schema_col(cls, old_col_dict, new_col_dict):
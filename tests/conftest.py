@@ -1,5 +1,6 @@
 import argparse
 import contextlib
+import functools
 import hashlib
 import io
 import json
@@ -244,8 +245,41 @@ def extract_archive(archive_path, extract_dir):
     return d
 
 
+def _copy_or_link(template, src, dst):
+    # Git objects are never modified once written, so copies of a repo can share them using hardlinks.
+    # Everything else - including working copies - could be modified in place, so is copied.
+    # Only the path within the template counts - the temp dir it was extracted to could contain anything.
+    if "objects" in Path(src).relative_to(template).parts:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+@pytest.fixture(scope="session")
+def data_archive_template(tmp_path_factory):
+    """
+    Extract each .tgz data archive at most once per session, for data_archive to copy from.
+    Don't write to the extracted dirs!
+
+    Produces a function that takes an archive name and returns the extracted directory path.
+    """
+    templates = {}
+
+    def _template(name):
+        archive_path = get_archive_path(name)
+        if archive_path not in templates:
+            extract_dir = tmp_path_factory.mktemp(f"template-{archive_path.stem}")
+            templates[archive_path] = extract_archive(archive_path, extract_dir)
+        return templates[archive_path]
+
+    return _template
+
+
 @pytest.fixture
-def data_archive(request, tmp_path_factory):
+def data_archive(request, tmp_path_factory, data_archive_template):
     """
     Extract a .tgz data archive to a temporary folder.
 
@@ -259,7 +293,14 @@ def data_archive(request, tmp_path_factory):
         extract_dir = tmp_path_factory.mktemp(request.node.name, numbered=True)
         cleanup = True
         try:
-            d = extract_archive(name, extract_dir)
+            template = data_archive_template(name)
+            d = extract_dir / template.name
+            shutil.copytree(
+                template,
+                d,
+                symlinks=True,
+                copy_function=functools.partial(_copy_or_link, template),
+            )
             with chdir_(d):
                 try:
                     yield d
@@ -885,13 +926,19 @@ def _edit_points(conn, dataset=None, working_copy=None):
 
     # Note - different DB backends support and interpret rowcount differently.
     # Sometimes rowcount is not supported for inserts, so it just returns -1.
-    # Rowcount can be 1 or 2 if 1 row has changed its PK
+    # Rowcount for the update can be 2 or 3, since the row that has changed its PK can be counted twice.
     r = conn.execute(insert_cmd, H.POINTS.RECORD)
     assert r.rowcount in (1, -1)
-    r = conn.execute(f"UPDATE {layer} SET fid=9998 WHERE fid=1;")
-    assert r.rowcount in (1, 2)
-    r = conn.execute(f"UPDATE {layer} SET name='test' WHERE fid=2;")
-    assert r.rowcount == 1
+    # Both updates in one statement: change the PK of fid=1, and the name of fid=2.
+    r = conn.execute(
+        f"""
+        UPDATE {layer} SET
+            fid = CASE WHEN fid=1 THEN 9998 ELSE fid END,
+            name = CASE WHEN fid=2 THEN 'test' ELSE name END
+        WHERE fid IN (1,2);
+        """
+    )
+    assert r.rowcount in (2, 3)
     r = conn.execute(f"DELETE FROM {layer} WHERE fid IN (3,30,31,32,33);")
     assert r.rowcount == 5
     pk_del = 3
@@ -915,10 +962,15 @@ def _edit_polygons(conn, dataset=None, working_copy=None):
     # See note on rowcount at _edit_points
     r = conn.execute(insert_cmd, H.POLYGONS.RECORD)
     assert r.rowcount in (1, -1)
-    r = conn.execute(f"UPDATE {layer} SET id=9998 WHERE id=1424927;")
-    assert r.rowcount in (1, 2)
-    r = conn.execute(f"UPDATE {layer} SET survey_reference='test' WHERE id=1443053;")
-    assert r.rowcount == 1
+    r = conn.execute(
+        f"""
+        UPDATE {layer} SET
+            id = CASE WHEN id=1424927 THEN 9998 ELSE id END,
+            survey_reference = CASE WHEN id=1443053 THEN 'test' ELSE survey_reference END
+        WHERE id IN (1424927,1443053);
+        """
+    )
+    assert r.rowcount in (2, 3)
     r = conn.execute(
         f"DELETE FROM {layer} WHERE id IN (1452332, 1456853, 1456912, 1457297, 1457355);"
     )
@@ -945,10 +997,15 @@ def _edit_table(conn, dataset=None, working_copy=None):
     r = conn.execute(insert_cmd, H.TABLE.RECORD)
     # rowcount is not actually supported for inserts, but works in certain DB types - otherwise is -1.
     assert r.rowcount in (1, -1)
-    r = conn.execute(f"""UPDATE {layer} SET "OBJECTID"=9998 WHERE "OBJECTID"=1;""")
-    assert r.rowcount in (1, 2)
-    r = conn.execute(f"""UPDATE {layer} SET "NAME"='test' WHERE "OBJECTID"=2;""")
-    assert r.rowcount == 1
+    r = conn.execute(
+        f"""
+        UPDATE {layer} SET
+            "OBJECTID" = CASE WHEN "OBJECTID"=1 THEN 9998 ELSE "OBJECTID" END,
+            "NAME" = CASE WHEN "OBJECTID"=2 THEN 'test' ELSE "NAME" END
+        WHERE "OBJECTID" IN (1,2);
+        """
+    )
+    assert r.rowcount in (2, 3)
     r = conn.execute(f"""DELETE FROM {layer} WHERE "OBJECTID" IN (3,30,31,32,33);""")
     assert r.rowcount == 5
     pk_del = 3
@@ -15,6 +15,7 @@ from kart.exceptions import (
 )
 from kart.commit import fallback_editor
 from kart.repo import KartRepo
+from kart.sqlalchemy.gpkg import Db_GPKG
 
 
 H = pytest.helpers.helpers()
@@ -46,32 +47,35 @@ def test_commit(
     """commit outstanding changes from the working copy"""
 
     with data_working_copy(archive) as (repo_dir, wc_path):
-        # empty
-        r = cli_runner.invoke(["commit", "-m", "test-commit-empty"])
-        assert r.exit_code == NO_CHANGES, r
-        assert r.stderr.splitlines() == ["Error: No changes to commit"]
+        # This repo and its working copy are used throughout - HEAD and the working copy contents are read
+        # fresh each time, so they don't need to be reopened after each command.
+        repo = KartRepo(repo_dir)
+        dataset = repo.datasets()[layer]
+        table_wc = repo.working_copy.tabular
 
-        # empty
-        r = cli_runner.invoke(["commit", "-m", "test-commit-empty", "--allow-empty"])
-        assert r.exit_code == 0, r
+        # WAL mode persists in the GPKG file, so it applies to every connection Kart makes to it from here on.
+        # Each commit then only needs to sync the WAL, rather than a rollback journal and the GPKG itself.
+        # The journal mode can't be changed inside a transaction, so it is set as the connection is opened.
+        wal_engine = Db_GPKG.create_engine(table_wc.full_path, journal_mode="WAL")
+        with wal_engine.connect() as conn:
+            journal_mode = conn.scalar("PRAGMA journal_mode;")
+        wal_engine.dispose()
+        assert journal_mode == "wal"
 
         # make some changes
-        repo = KartRepo(repo_dir)
-        with repo.working_copy.tabular.session() as sess:
+        with table_wc.session() as sess:
             try:
                 edit_func = locals()[f"edit_{archive}"]
                 pk_del = edit_func(sess)
             except KeyError:
                 raise NotImplementedError(f"No edit_{archive}")
+            # Reuses the session the edits were made in, rather than starting a new one.
+            original_change_count = table_wc.tracking_changes_count(dataset)
 
         print(f"deleted fid={pk_del}")
 
-        repo = KartRepo(repo_dir)
-        dataset = repo.datasets()[layer]
-
-        table_wc = repo.working_copy.tabular
-        original_change_count = table_wc.tracking_changes_count(dataset)
-
+        # Commit times are in whole seconds.
+        time_before_commit = int(time.time())
         if partial:
             r = cli_runner.invoke(
                 ["commit", "-m", "test-commit-1", "-o", "json", f"{layer}:{pk_del}"]
@@ -84,11 +88,12 @@ def test_commit(
         print("commit:", commit_id)
 
         assert str(repo.head.target) == commit_id
-        commit = repo.head_commit
+        # The commit ID is already known from the output, so there's no need to peel HEAD again.
+        commit = repo[commit_id]
         assert commit.message == "test-commit-1"
-        assert time.time() - commit.commit_time < 10
+        assert time_before_commit <= commit.commit_time < time_before_commit + 10
 
-        tree = repo.head_tree
+        tree = commit.tree
         assert dataset.encode_1pk_to_path(pk_del) not in tree
 
         table_wc.assert_matches_tree(tree)
@@ -99,18 +104,29 @@ def test_commit(
             assert change_count == original_change_count - 1
 
             # Changes should still be visible in the working copy:
-            r = cli_runner.invoke(["diff", "--exit-code"])
-            assert r.exit_code == 1, r
-            assert r.stdout != ""
+            assert table_wc.is_dirty()
 
         else:
             assert (
                 change_count == 0
             ), f"Changes still listed in {table_wc.KART_TRACK_NAME} after full commit"
 
-            r = cli_runner.invoke(["diff", "--exit-code"])
-            assert r.exit_code == 0, r
-            assert r.stdout == ""
+            assert not table_wc.is_dirty()
+
+
+def test_commit_empty(data_working_copy, cli_runner):
+    """commit with no outstanding changes"""
+    with data_working_copy("points") as (repo_dir, wc_path):
+        r = cli_runner.invoke(["commit", "-m", "test-commit-empty"])
+        assert r.exit_code == NO_CHANGES, r
+        assert r.stderr.splitlines() == ["Error: No changes to commit"]
+
+        r = cli_runner.invoke(["commit", "-m", "test-commit-empty", "--allow-empty"])
+        assert r.exit_code == 0, r
+
+        repo = KartRepo(repo_dir)
+        assert repo.head_commit.message == "test-commit-empty"
+        assert repo.head_commit.parents[0].hex == H.POINTS.HEAD_SHA
 
 
 def test_tag(data_working_copy, cli_runner):
@@ -158,7 +174,8 @@ def test_commit_message(
         repo = KartRepo(repo_dir)
 
         def last_message():
-            return repo.head_commit.message
+            # repo.head is already resolved to the branch, so its target is the commit ID.
+            return repo[repo.head.target].message
 
         # normal
         r = cli_runner.invoke(
@@ -209,7 +226,6 @@ def test_commit_message(
         # default editor
 
         # make some changes
-        repo = KartRepo(repo_dir)
         with repo.working_copy.tabular.session() as sess:
             edit_points(sess)
 
@@ -9,6 +9,7 @@ from kart.geometry import (
     hex_wkb_to_gpkg_geom,
     normalise_gpkg_geom,
     ogr_to_gpkg_geom,
+    wkb_to_gpkg_geom,
     GPKG_ENVELOPE_NONE,
     GPKG_ENVELOPE_XY,
 )
@@ -110,6 +111,24 @@ def test_wkb_gpkg_wkb_roundtrip(input_wkb, expected_gpkg_geom, expected_wkb):
     assert gpkg_geom_to_hex_wkb(gpkg_geom) == expected_wkb
 
 
+@pytest.mark.parametrize(
+    "wkt",
+    [
+        "POINT(1 2)",
+        "POINT Z(1 2 3)",
+        "POINT M(1 2 4)",
+        "POINT ZM(1 2 3 4)",
+        "POINT EMPTY",
+        "LINESTRING(1 2,3 4)",
+    ],
+)
+def test_wkb_to_gpkg_geom_matches_ogr(wkt):
+    # wkb_to_gpkg_geom skips OGR for points - check it gives the same result as going via OGR.
+    ogr_geom = ogr.CreateGeometryFromWkt(wkt)
+    wkb = ogr_geom.ExportToIsoWkb(ogr.wkbNDR)
+    assert wkb_to_gpkg_geom(wkb) == ogr_to_gpkg_geom(ogr_geom)
+
+
 @pytest.mark.parametrize(
     "input,expected",
     [
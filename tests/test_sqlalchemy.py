@@ -1,6 +1,8 @@
+from pysqlite3 import dbapi2 as sqlite
 import pytest
 
 from kart.sqlalchemy.gpkg import Db_GPKG
+from kart.sqlalchemy.sqlite import sqlite_engine
 
 H = pytest.helpers.helpers()
 
@@ -12,3 +14,30 @@ def test_gpkg_engine(data_working_copy):
         with engine.connect() as db:
             r = db.execute(f"SELECT * FROM {H.POINTS.LAYER} LIMIT 1;")
             assert r.fetchone() is not None
+            assert (
+                db.scalar("PRAGMA cache_size;") == -Db_GPKG.GPKG_CACHE_SIZE_MiB * 1024
+            )
+
+
+def test_sqlite_engine_pragmas(tmp_path):
+    engine = sqlite_engine(
+        tmp_path / "test.db", journal_mode="WAL", pragmas={"cache_size": -1024}
+    )
+    with engine.connect() as db:
+        assert db.scalar("PRAGMA journal_mode;") == "wal"
+        # 1 = NORMAL
+        assert db.scalar("PRAGMA synchronous;") == 1
+        # 2 = MEMORY
+        assert db.scalar("PRAGMA temp_store;") == 2
+        assert db.scalar("PRAGMA foreign_keys;") == 1
+        assert db.scalar("PRAGMA cache_size;") == -1024
+        # Memory-mapping isn't turned on, since it's not safe on all filesystems.
+        assert db.scalar("PRAGMA mmap_size;") == _default_mmap_size()
+
+
+def _default_mmap_size():
+    conn = sqlite.connect(":memory:")
+    try:
+        return conn.execute("PRAGMA mmap_size;").fetchone()[0]
+    finally:
+        conn.close()
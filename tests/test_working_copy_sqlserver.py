@@ -1,5 +1,7 @@
 import pytest
 import pygit2
+import sqlalchemy as sa
+from sqlalchemy.dialects.mssql.base import MSDialect
 from sqlalchemy.exc import IntegrityError
 
 from kart.exceptions import NotFound
@@ -7,8 +9,10 @@ from kart.repo import KartRepo
 from kart.sqlalchemy import strip_password
 from kart.sqlalchemy.sqlserver import Db_SqlServer
 from kart.sqlalchemy.adapter.sqlserver import KartAdapter_SqlServer
+from kart.sqlalchemy.upsert import Upsert
 
 from kart.tabular.working_copy.base import TableWorkingCopyStatus
+from kart.tabular.working_copy.sqlserver import WorkingCopy_SqlServer
 from test_working_copy import compute_approximated_types
 
 pytestmark = pytest.mark.mssql
@@ -253,6 +257,67 @@ def test_commit_edits(
             assert repo.head.peel(pygit2.Commit).hex == orig_head
 
 
+def _restore_edited_points(
+    data_archive, cli_runner, new_sqlserver_db_schema, edit_points
+):
+    """
+    Edits the points working copy then restores it, which rewrites the 7 original features that were edited,
+    and checks that the restored features (including their geometry) match HEAD.
+    """
+    with data_archive("points") as repo_path:
+        repo = KartRepo(repo_path)
+        H.clear_working_copy()
+
+        with new_sqlserver_db_schema() as (sqlserver_url, sqlserver_schema):
+            r = cli_runner.invoke(["create-workingcopy", sqlserver_url])
+            assert r.exit_code == 0, r.stderr
+
+            table_wc = repo.working_copy.tabular
+            with table_wc.session() as sess:
+                edit_points(sess, repo.datasets()[H.POINTS.LAYER], table_wc)
+
+            r = cli_runner.invoke(["restore"])
+            assert r.exit_code == 0, r.stderr
+            assert table_wc.tracking_changes_count() == 0
+
+            # Mark the restored features as dirty again - without changing them - so that diff compares them to HEAD.
+            kart_track = table_wc.kart_tables.kart_track
+            with table_wc.session() as sess:
+                sess.execute(
+                    kart_track.insert(),
+                    [
+                        {"table_name": H.POINTS.LAYER, "pk": str(pk)}
+                        for pk in (1, 2, 3, 30, 31, 32, 33)
+                    ],
+                )
+
+            r = cli_runner.invoke(["diff", "--exit-code"])
+            assert r.exit_code == 0, r.stdout
+
+
+def test_restore_via_staging_table(
+    data_archive, cli_runner, new_sqlserver_db_schema, edit_points, monkeypatch
+):
+    monkeypatch.setattr(WorkingCopy_SqlServer, "STAGING_TABLE_MIN_ROWS", 1)
+    _restore_edited_points(
+        data_archive, cli_runner, new_sqlserver_db_schema, edit_points
+    )
+
+
+def test_restore_via_multirow_merge(
+    data_archive, cli_runner, new_sqlserver_db_schema, edit_points, monkeypatch
+):
+    # Each point uses 10 params - 1 for each of the 5 other columns, plus 5 for the geometry, which binds its value
+    # and its CRS ID twice each, plus 'POINT EMPTY'. So this allows 2 features per MERGE, and 2 MERGEs per
+    # executemany. The 7 restored features are written as one executemany of 2 full MERGEs,
+    # then another executemany of 1 full MERGE, then a smaller MERGE with the 1 leftover feature.
+    monkeypatch.setattr(WorkingCopy_SqlServer, "MAX_PARAMS_PER_STATEMENT", 20)
+    monkeypatch.setattr(WorkingCopy_SqlServer, "STATEMENTS_PER_EXECUTEMANY", 2)
+    _restore_edited_points(
+        data_archive, cli_runner, new_sqlserver_db_schema, edit_points
+    )
+
+
 def test_edit_schema(data_archive, cli_runner, new_sqlserver_db_schema):
     with data_archive("polygons") as repo_path:
         repo = KartRepo(repo_path)
@@ -382,6 +447,34 @@ def test_approximated_types():
     )
 
 
+def test_upsert_multirow():
+    table = sa.Table(
+        "mytable",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.Text),
+    )
+    stmt = Upsert(table, row_count=2)
+    assert str(stmt.compile(dialect=MSDialect())) == (
+        "MERGE mytable TARGET USING (VALUES (:id_0, :name_0), (:id_1, :name_1)) AS SOURCE (id, name)"
+        " ON SOURCE.id = TARGET.id"
+        " WHEN MATCHED THEN UPDATE SET name = SOURCE.name"
+        " WHEN NOT MATCHED THEN INSERT (id, name) VALUES (SOURCE.id, SOURCE.name);"
+    )
+    assert stmt.multirow_params([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]) == {
+        "id_0": 1,
+        "name_0": "a",
+        "id_1": 2,
+        "name_1": "b",
+    }
+
+    # Upserts into the same table with the same row_count share a cache key, so they are only compiled once.
+    assert (
+        stmt._generate_cache_key() == Upsert(table, row_count=2)._generate_cache_key()
+    )
+    assert stmt._generate_cache_key() != Upsert(table)._generate_cache_key()
+
+
 def test_types_roundtrip(data_archive, cli_runner, new_sqlserver_db_schema):
     with data_archive("types") as repo_path:
         repo = KartRepo(repo_path)